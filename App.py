@@ -1,19 +1,38 @@
 import os
+import re
 import time
+import operator
+import queue
+import gzip
+import json
+import sqlite3
+import sys
+import tempfile
 import threading
 import zipfile
-from flask import Flask, render_template_string, request, send_from_directory, jsonify, Response
+import zlib
+from flask import Flask, render_template, request, send_from_directory, jsonify, Response, stream_with_context
 import webbrowser
-from datetime import datetime
-from math import ceil
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from array import array
+from itertools import compress, repeat
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil, inf
+from functools import lru_cache
+from urllib.parse import urlencode
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from waitress import serve
 
 app = Flask(__name__)
 
 # Configuration
 HOME_FOLDER = os.path.expanduser('~')
 PORT = 5000
+SERVER_THREADS = 16  # Each open tab holds one for its /updates stream
+SSE_KEEPALIVE = 30  # Seconds between keepalive comments on an idle /updates stream
 FILES_PER_PAGE = 20
 SUPPORTED_EXTENSIONS = {
     'pdf': '📄 PDF',
@@ -21,16 +40,66 @@ SUPPORTED_EXTENSIONS = {
     'xlsx': '📊 Excel',
     'zip': '🗜️ ZIP'
 }
+# Folders never walked or watched, along with any whose name starts with a dot
+SKIP_DIRS = frozenset({
+    'node_modules', '__pycache__', 'venv', 'AppData', 'Library', 'site-packages'
+})
 DEBOUNCE_DELAY = 300
-CACHE_EXPIRY = 5
+RESCAN_INTERVAL = 600  # Full re-walk as a safety net; watchdog events keep the cache current in between
+RESULT_CACHE_SIZE = 64
+RESPONSE_CACHE_SIZE = 128
+SCAN_WORKERS = 8
+TRIGRAM_INDEX_MIN_FILES = 5000  # Below this a plain scan is already under a millisecond
+TRIGRAM_INDEX_DELAY = 5  # Seconds without changes before the trigram index is rebuilt
+TRIGRAM_INDEX_INTERVAL = 60  # Minimum seconds between trigram index rebuilds
+# On POSIX, list directories through an open fd so entry.stat() is an fstatat
+# relative to it instead of a lookup of the full path from the root
+SCAN_BY_FD = os.scandir in os.supports_fd
+# Text responses gzipped when the browser accepts it; /updates is never compressed
+COMPRESS_MIMETYPES = frozenset({'text/html', 'application/json', 'text/css', 'text/javascript'})
+COMPRESS_MIN_SIZE = 500
+COMPRESS_LEVEL = 6
+ZIP_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'records_zip_contents.sqlite3')
 
 # State management
-dark_mode = False
 file_cache = []
+# Column views of file_cache used by the filter, kept index-aligned with it.
+# A 'trigrams' index is added once built for large caches.
+file_columns = {
+    'mtimes': array('d'), 'search_texts': [], 'search_blob': '', 'offsets': array('q', [0]), 'by_type': {}
+}
 last_cache_update = 0
 cache_lock = threading.Lock()
+cache_generation = 0
 app.last_cache_update = 0
 
+# Recent filter results: (generation, type, date_from, date_to, query) -> indices into file_cache.
+# Kept as ranges or array('i'), 4 bytes per id, since a broad query on a big cache matches most of it
+result_cache = OrderedDict()
+result_cache_lock = threading.Lock()
+
+# Recent /api/search bodies: (cache version, raw query string) -> (etag, JSON bytes)
+response_cache = OrderedDict()
+response_cache_lock = threading.Lock()
+
+# Cache entries by full path, newest first as of the last full scan with later changes
+# at the end; only touched by the cache updater thread
+file_index = {}
+
+# Filesystem changes reported by the observer, waiting to be applied by the updater
+pending_files = set()
+pending_dirs = set()
+pending_lock = threading.Lock()
+changes_ready = threading.Event()
+
+# One queue per open /updates stream; the updater pushes the new version to each on publish
+update_subscribers = set()
+subscribers_lock = threading.Lock()
+
+# ZIP listings kept across restarts (an SQLite connection opened on first use; False once closed or failed)
+zip_cache = None
+zip_cache_lock = threading.Lock()
+
 # Global variables for thread management
 observer = None
 cache_thread = None
@@ -39,112 +108,500 @@ stop_event = threading.Event()
 class FileChangeHandler(FileSystemEventHandler):
     def __init__(self, app):
         self.app = app
-        self.debounce_timers = {}
+        # One timer for all paths, re-armed on every event, so a bulk copy
+        # doesn't start a thread per file
+        self.debounce_timer = None
+        self.debounce_lock = threading.Lock()
         super().__init__()
     
     def on_any_event(self, event):
-        if not event.is_directory:
-            ext = event.src_path.lower().split('.')[-1] if '.' in event.src_path else ''
-            if ext in SUPPORTED_EXTENSIONS:
-                with app.app_context():
-                    app.last_cache_update = 0
-                    print(f"File change detected: {event.src_path}")  # Debug logging
-                
-                if event.src_path in self.debounce_timers:
-                    self.debounce_timers[event.src_path].cancel()
-                
-                timer = threading.Timer(0.3, self.trigger_update)
-                self.debounce_timers[event.src_path] = timer
-                timer.start()
+        if event.event_type in ('opened', 'closed_no_write'):
+            return
+        paths = [event.src_path]
+        if event.event_type == 'moved':
+            paths.append(event.dest_path)
+        paths = [path for path in paths if not in_skipped_dir(path, event.is_directory)]
+        if not paths:
+            return
+        
+        if event.is_directory:
+            # A modified directory just means a child changed, and the child reports itself
+            if event.event_type == 'modified':
+                return
+            with pending_lock:
+                pending_dirs.update(paths)
+        else:
+            # Only the extension is lowered, not the whole path
+            files = [path for path in paths if os.path.splitext(path)[1][1:].lower() in SUPPORTED_EXTENSIONS]
+            # Windows reports a folder deleted or moved out of HOME as a file, so there any other
+            # path that went away is also handled as a folder; if it was a file, nothing is under it
+            dirs = []
+            if sys.platform == 'win32' and event.event_type in ('deleted', 'moved'):
+                dirs = [path for path in paths if path not in files]
+            if not files and not dirs:
+                return
+            with pending_lock:
+                pending_files.update(files)
+                pending_dirs.update(dirs)
+        
+        print(f"File change detected: {event.src_path}")  # Debug logging
+        
+        with self.debounce_lock:
+            if self.debounce_timer:
+                self.debounce_timer.cancel()
+            self.debounce_timer = threading.Timer(0.3, self.trigger_update)
+            self.debounce_timer.daemon = True
+            self.debounce_timer.start()
     
     def trigger_update(self):
-        with app.app_context():
-            print("File change detected - forcing immediate cache update")
-            app.last_cache_update = 0
-            # Force cache update immediately
-            global last_cache_update
-            last_cache_update = 0
-
-def get_zip_contents(zip_path):
+        print("File change detected - applying to cache")
+        changes_ready.set()
+
+def is_skipped_dir(name):
+    return name in SKIP_DIRS or name.startswith('.')
+
+def in_skipped_dir(path, is_directory):
+    """Tell whether path is, or is inside, a folder the scan skips."""
+    parts = os.path.relpath(path, HOME_FOLDER).split(os.sep)
+    if not is_directory:
+        parts.pop()
+    return any(map(is_skipped_dir, parts))
+
+def zip_cache_query(sql, params):
+    """Run sql on the ZIP listing database, opening it on first use.
+
+    Returns the first row, or None. If the database fails it is dropped for the rest
+    of the run, and listings are only kept by get_zip_contents' in-memory cache.
+    """
+    global zip_cache
+    with zip_cache_lock:
+        if zip_cache is False:
+            return None
+        try:
+            if zip_cache is None:
+                # Shared by all request threads, always under zip_cache_lock;
+                # autocommit, so every listing is on disk as soon as it is written
+                zip_cache = sqlite3.connect(ZIP_CACHE_PATH, check_same_thread=False, isolation_level=None)
+                zip_cache.execute('CREATE TABLE IF NOT EXISTS zip_contents (path TEXT PRIMARY KEY, mtime REAL, contents TEXT)')
+            return zip_cache.execute(sql, params).fetchone()
+        except sqlite3.Error as e:
+            print(f"ZIP cache unavailable: {str(e)}")
+            if zip_cache is not None:
+                zip_cache.close()
+            zip_cache = False
+            return None
+
+@lru_cache(maxsize=512)
+def get_zip_contents(zip_path, mtime):
+    # mtime is part of the cache key, so a rewritten archive is re-read.
+    # One row per archive, replaced when it changes, so the file doesn't grow with rewrites.
+    cached = zip_cache_query('SELECT mtime, contents FROM zip_contents WHERE path = ?', (zip_path,))
+    if cached is not None and cached[0] == mtime:
+        return json.loads(cached[1])
+    
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            return zip_ref.namelist()[:5]
+            contents = zip_ref.namelist()[:5]
     except:
         return None
+    zip_cache_query('INSERT OR REPLACE INTO zip_contents VALUES (?, ?, ?)', (zip_path, mtime, json.dumps(contents)))
+    return contents
+
+def lookup_results(key):
+    with result_cache_lock:
+        ids = result_cache.get(key)
+        if ids is not None:
+            result_cache.move_to_end(key)
+        return ids
+
+def store_results(key, ids):
+    with result_cache_lock:
+        result_cache[key] = ids
+        result_cache.move_to_end(key)
+        while len(result_cache) > RESULT_CACHE_SIZE:
+            result_cache.popitem(last=False)
+
+def lookup_response(key):
+    with response_cache_lock:
+        entry = response_cache.get(key)
+        if entry is not None:
+            response_cache.move_to_end(key)
+        return entry
+
+def store_response(key, entry):
+    with response_cache_lock:
+        response_cache[key] = entry
+        response_cache.move_to_end(key)
+        while len(response_cache) > RESPONSE_CACHE_SIZE:
+            response_cache.popitem(last=False)
+
+def find_prefix_results(base_key, search_terms):
+    """Return cached ids for the longest cached prefix of the query whose matches cover it.
+
+    Terms are OR-ed, so a prefix's results only contain the full query's results
+    when every full term contains one of the prefix terms (e.g. "tes" -> "test").
+    """
+    query = ' '.join(search_terms)
+    for end in range(len(query) - 1, -1, -1):
+        prefix_terms = query[:end].split()
+        if prefix_terms and not all(any(p in term for p in prefix_terms) for term in search_terms):
+            continue
+        ids = lookup_results(base_key + (' '.join(prefix_terms),))
+        if ids is not None:
+            return ids
+    return None
+
+def build_pattern(search_terms):
+    # One compiled alternation scans each text once instead of once per term
+    return re.compile('|'.join(re.escape(term) for term in dict.fromkeys(search_terms)))
+
+def build_matcher(search_terms):
+    """Return a function mapping search_texts to flags telling whether each contains any term."""
+    if len(search_terms) == 1:
+        term = search_terms[0]
+        return lambda texts: map(operator.contains, texts, repeat(term))
+    pattern = build_pattern(search_terms)
+    return lambda texts: map(pattern.search, texts)
+
+def build_columns(files):
+    # Per-type id arrays keep the newest-first order of files; 4 bytes per id
+    # rather than a list slot plus an int object for every id above 256
+    by_type = {ext: array('i') for ext in SUPPORTED_EXTENSIONS}
+    for i, f in enumerate(files):
+        by_type[f['type']].append(i)
+    search_texts = [f['search_text'] for f in files]
+    # All texts joined by newlines (terms never contain whitespace), with each text's
+    # start offset plus a final end sentinel, so a range can be searched in one C call
+    offsets = array('q', [0])
+    for text in search_texts:
+        offsets.append(offsets[-1] + len(text) + 1)
+    return {
+        'mtimes': array('d', [f['modified'] for f in files]),
+        'search_texts': search_texts,
+        'search_blob': '\n'.join(search_texts),
+        'offsets': offsets,
+        'by_type': by_type,
+    }
+
+def build_trigram_index(search_texts):
+    """Map every 3-character substring to the ascending ids of the texts containing it."""
+    index = {}
+    for i, text in enumerate(search_texts):
+        for gram in {text[j:j + 3] for j in range(len(text) - 2)}:
+            ids = index.get(gram)
+            if ids is None:
+                ids = index[gram] = array('i')
+            ids.append(i)
+    return index
+
+def trigram_candidates(columns, search_terms):
+    """Return ascending ids that may contain one of the terms, or None if the index can't tell.
+
+    Candidates still need a real substring check; sharing all trigrams doesn't imply a match.
+    """
+    index = columns.get('trigrams')
+    if index is None or min(map(len, search_terms)) < 3:
+        return None
+    empty = array('i')
+    candidates = set()
+    for term in search_terms:
+        postings = sorted((index.get(term[j:j + 3], empty) for j in range(len(term) - 2)), key=len)
+        candidates.update(set(postings[0]).intersection(*postings[1:]))
+    return sorted(candidates)
+
+def scan_blob(columns, search_terms, matches_search, start, end):
+    """Return the ascending ids in range(start, end) whose text contains one of the terms.
+
+    Searches the joined blob from match to match, so rare terms cost one C scan instead
+    of a call per text. Once matches turn out to be dense, the rest of the range is
+    checked text by text, which is cheaper than a search call and bisect per hit.
+    """
+    blob = columns['search_blob']
+    offsets = columns['offsets']
+    search = build_pattern(search_terms).search
+    ids = array('i')
+    pos, stop = offsets[start], offsets[end]
+    while True:
+        match = search(blob, pos, stop)
+        if match is None:
+            return ids
+        i = bisect_right(offsets, match.start(), start, end) - 1
+        ids.append(i)
+        pos = offsets[i + 1]
+        if len(ids) > 64 and len(ids) * 16 > i - start:
+            ids.extend(compress(range(i + 1, end), matches_search(columns['search_texts'][i + 1:end])))
+            return ids
+
+def _scan(path, folder, subdirs=None):
+    """Yield (full_path, name, folder, ext, stat) for supported files below path.
+
+    folder is path relative to HOME_FOLDER. If subdirs is given, subdirectories
+    are appended to it instead of being walked.
+    """
+    # Explicit stack rather than recursion, so deep trees can't hit the recursion limit
+    stack = [(path, folder)]
+    while stack and not stop_event.is_set():
+        path, folder = stack.pop()
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY) if SCAN_BY_FD else None
+        except OSError:
+            continue
+        try:
+            # Entries listed from an fd carry only their name as .path
+            with os.scandir(path if fd is None else fd) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if is_skipped_dir(entry.name):
+                                continue
+                            sub_folder = f"{folder}/{entry.name}" if folder else entry.name
+                            (stack if subdirs is None else subdirs).append((os.path.join(path, entry.name), sub_folder))
+                            continue
+                        name = entry.name
+                        # Only the short suffix is lowered, not the whole name
+                        dot = name.rfind('.')
+                        if dot < 0:
+                            continue
+                        ext = name[dot + 1:].lower()
+                        if ext in SUPPORTED_EXTENSIONS:
+                            # Free on Windows (filled from the directory listing); on POSIX this is
+                            # the walk's only per-file syscall, paid for supported files only
+                            yield os.path.join(path, name), name, folder, ext, entry.stat()
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+def scan_home(index):
+    """Walk HOME_FOLDER into index with a pool of threads sharing one queue of directories.
+
+    Directory reads are I/O bound, so reading several at once overlaps their latency.
+    Each worker lists one directory at a time and queues its subdirectories, so one
+    big top-level folder is still spread over every worker.
+    Returns the number of entries that had to be (re)built.
+    """
+    dirs = queue.Queue()
+    dirs.put((HOME_FOLDER, ''))
+    outstanding = 1  # Directories queued or being listed
+    outstanding_lock = threading.Lock()
+    
+    def worker():
+        nonlocal outstanding
+        updated = 0
+        while True:
+            item = dirs.get()
+            if item is None:
+                return updated
+            subdirs = []
+            try:
+                updated += index_files(_scan(*item, subdirs), index)
+            finally:
+                for subdir in subdirs:
+                    dirs.put(subdir)
+                with outstanding_lock:
+                    outstanding += len(subdirs) - 1
+                    if outstanding == 0:
+                        # Everything is listed; release all workers
+                        for _ in range(SCAN_WORKERS):
+                            dirs.put(None)
+    
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        workers = [pool.submit(worker) for _ in range(SCAN_WORKERS)]
+        return sum(future.result() for future in workers)
+
+def make_entry(full_path, name, folder, ext, stat):
+    # Kept lean since there is one per file; display strings are built per page by display_row.
+    # Folder and type repeat across many entries, so every entry shares one copy of each.
+    folder = sys.intern(folder or '/')
+    return {
+        'name': name,
+        'full_path': full_path,
+        'size': stat.st_size,
+        'modified': stat.st_mtime,
+        'folder': folder,
+        'search_text': f"{name}\x00{folder}".lower(),
+        'type': sys.intern(ext)
+    }
+
+def display_row(f):
+    """Expand a cache entry into the fields shown on a file card."""
+    return {
+        'name': f['name'],
+        'path': f['name'] if f['folder'] == '/' else f"{f['folder']}/{f['name']}",
+        'size': f"{f['size']/1024:.1f} KB",
+        'modified_str': datetime.fromtimestamp(f['modified']).strftime('%Y-%m-%d %H:%M'),
+        'folder': f['folder'],
+        'type': f['type'],
+        'icon': SUPPORTED_EXTENSIONS.get(f['type'], '📄'),
+        # ZIP listings are only read for the files actually shown
+        'zip_contents': get_zip_contents(f['full_path'], f['modified']) if f['type'] == 'zip' else None
+    }
+
+def index_files(scanned, index):
+    """Add scan results to index, reusing current entries whose mtime is unchanged.
+
+    Returns the number of entries that had to be (re)built.
+    """
+    updated = 0
+    for full_path, name, folder, ext, stat in scanned:
+        cached_file = file_index.get(full_path)
+        if cached_file and cached_file['modified'] == stat.st_mtime:
+            index[full_path] = cached_file
+        else:
+            index[full_path] = make_entry(full_path, name, folder, ext, stat)
+            updated += 1
+    return updated
+
+def relative_folder(path):
+    rel_path = os.path.relpath(path, HOME_FOLDER)
+    return '' if rel_path == os.curdir else rel_path.replace(os.sep, '/')
+
+def take_pending_changes():
+    with pending_lock:
+        files = set(pending_files)
+        dirs = set(pending_dirs)
+        pending_files.clear()
+        pending_dirs.clear()
+    return files, dirs
+
+def apply_changes(files, dirs):
+    """Bring file_index up to date for the changed paths without walking all of HOME.
+
+    New and rebuilt entries are added at the end of file_index (see publish_cache).
+    Returns the number of entries (re)built and the number removed.
+    """
+    updated = removed = 0
+    if dirs:
+        # Forget whatever was under the directories, then re-read what is there now.
+        # One pass over the index for all of them: each distinct folder is checked once
+        # against the changed ones, then entries are matched by folder.
+        changed = {relative_folder(dir_path) for dir_path in dirs}
+        stale_folders = set()
+        for folder in {f['folder'] for f in file_index.values()}:
+            parts = folder.split('/')
+            if any('/'.join(parts[:n]) in changed for n in range(1, len(parts) + 1)):
+                stale_folders.add(folder)
+        if stale_folders:
+            stale = [path for path, f in file_index.items() if f['folder'] in stale_folders]
+            for full_path in stale:
+                del file_index[full_path]
+            removed += len(stale)
+        for dir_path in dirs:
+            updated += index_files(_scan(dir_path, relative_folder(dir_path)), file_index)
+    
+    for full_path in files:
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            if file_index.pop(full_path, None):
+                removed += 1
+            continue
+        cached_file = file_index.get(full_path)
+        if cached_file and cached_file['modified'] == stat.st_mtime:
+            continue
+        file_index.pop(full_path, None)
+        folder, name = os.path.split(full_path)
+        ext = name[name.rfind('.') + 1:].lower()
+        updated += index_files([(full_path, name, relative_folder(folder), ext, stat)], file_index)
+    return updated, removed
+
+def publish_cache():
+    """Swap in a sorted cache built from file_index.
+
+    Between full scans file_index is kept in the published order with changes added at
+    its end, so the sort sees one long sorted run plus a short tail and merges them in a
+    single pass instead of re-sorting everything.
+    """
+    global file_cache, file_columns, last_cache_update, cache_generation
+    new_cache = sorted(file_index.values(), key=operator.itemgetter('modified'), reverse=True)
+    new_columns = build_columns(new_cache)
+    
+    with cache_lock:
+        file_cache = new_cache
+        file_columns = new_columns
+        cache_generation += 1
+        with result_cache_lock:
+            result_cache.clear()
+        with response_cache_lock:
+            response_cache.clear()
+        last_cache_update = time.time()
+        app.last_cache_update = last_cache_update
+        print(f"Cache updated with {len(file_cache)} files")  # Debug logging
+    
+    with subscribers_lock:
+        for subscriber in update_subscribers:
+            subscriber.put(last_cache_update)
+
+def index_snapshot():
+    """Attach a trigram index to the published snapshot; searches scan until it is attached."""
+    with cache_lock:
+        columns = file_columns
+    if len(columns['search_texts']) >= TRIGRAM_INDEX_MIN_FILES:
+        columns['trigrams'] = build_trigram_index(columns['search_texts'])
 
 def update_file_cache():
-    global file_cache, last_cache_update
-    previous_files = {f['full_path']: f for f in file_cache}
+    global file_index
+    last_full_scan = 0
+    # The index takes seconds to build on a big cache, so a stream of small changes
+    # (e.g. a spreadsheet autosaving) doesn't rebuild it every time: it waits until the
+    # changes have stopped for a while, and is built at most once per interval
+    index_due = None
+    last_index_build = 0
     
     while not stop_event.is_set():
-        if time.time() - last_cache_update > CACHE_EXPIRY or app.last_cache_update == 0:
-            start_time = time.time()
-            new_cache = []
-            files_processed = 0
-            files_updated = 0
-            current_files = set()
+        # Sleep until the watcher reports something, the index is due or the next rescan is
+        wake = last_full_scan + RESCAN_INTERVAL
+        if index_due is not None:
+            wake = min(wake, index_due)
+        changes_ready.wait(timeout=max(0, wake - time.time()))
+        if stop_event.is_set():
+            break
+        try:
+            if time.time() - last_full_scan > RESCAN_INTERVAL:
+                start_time = time.time()
+                # Anything reported so far is picked up by the walk itself
+                changes_ready.clear()
+                take_pending_changes()
+                new_index = {}
+                files_updated = scan_home(new_index)
+                if stop_event.is_set():
+                    break
+                
+                file_index = new_index
+                last_full_scan = time.time()
+                publish_cache()
+                # Walk order -> published order, so later sorts start from one sorted run
+                file_index = {f['full_path']: f for f in file_cache}
+                # Right away, unless changes came in during the walk
+                index_due = time.time()
+                
+                print(f"Cache updated in {time.time()-start_time:.2f}s - Processed: {len(file_index)}, Updated: {files_updated}, Total: {len(file_cache)}")
             
-            try:
-                # First pass: collect all files
-                for root, _, files_in_dir in os.walk(HOME_FOLDER):
-                    if stop_event.is_set():
-                        break
-                    for file in files_in_dir:
-                        if '.' in file:
-                            ext = file.lower().split('.')[-1]
-                            if ext in SUPPORTED_EXTENSIONS:
-                                full_path = os.path.join(root, file)
-                                current_files.add(full_path)
-                
-                # Second pass: process files
-                for full_path in current_files:
-                    if stop_event.is_set():
-                        break
-                    try:
-                        ext = full_path.lower().split('.')[-1]
-                        stat = os.stat(full_path)
-                        current_mtime = stat.st_mtime
-                        files_processed += 1
-                        
-                        cached_file = previous_files.get(full_path)
-                        
-                        if cached_file and cached_file['modified'] == current_mtime:
-                            new_cache.append(cached_file)
-                        else:
-                            files_updated += 1
-                            rel_path = os.path.relpath(full_path, HOME_FOLDER)
-                            web_path = rel_path.replace('\\', '/')
-                            
-                            new_cache.append({
-                                'name': os.path.basename(full_path),
-                                'path': web_path,
-                                'full_path': full_path,
-                                'size': f"{stat.st_size/1024:.1f} KB",
-                                'modified': current_mtime,
-                                'modified_str': datetime.fromtimestamp(current_mtime).strftime('%Y-%m-%d %H:%M'),
-                                'folder': os.path.dirname(rel_path) or '/',
-                                'type': ext,
-                                'icon': SUPPORTED_EXTENSIONS.get(ext, '📄'),
-                                'zip_contents': get_zip_contents(full_path) if ext == 'zip' else None
-                            })
-                            
-                    except (PermissionError, FileNotFoundError):
+            elif changes_ready.is_set():
+                changes_ready.clear()
+                files, dirs = take_pending_changes()
+                if files or dirs:
+                    start_time = time.time()
+                    files_updated, files_removed = apply_changes(files, dirs)
+                    # e.g. a deleted temp file, reported in case it was a folder
+                    if not files_updated and not files_removed:
                         continue
-                
-                new_cache.sort(key=lambda x: -x['modified'])
-                
-                with cache_lock:
-                    file_cache = new_cache
-                    last_cache_update = time.time()
-                    app.last_cache_update = last_cache_update
-                    print(f"Cache updated with {len(file_cache)} files")  # Debug logging
-                
-                print(f"Cache updated in {time.time()-start_time:.2f}s - Processed: {files_processed}, Updated: {files_updated}, Total: {len(file_cache)}")
-                
-            except Exception as e:
-                print(f"Cache update error: {str(e)}")
+                    publish_cache()
+                    index_due = max(time.time() + TRIGRAM_INDEX_DELAY, last_index_build + TRIGRAM_INDEX_INTERVAL)
+                    print(f"Applied {len(files)} file and {len(dirs)} folder changes in {time.time()-start_time:.2f}s - Updated: {files_updated}, Removed: {files_removed}, Total: {len(file_cache)}")
+            
+            elif index_due is not None and time.time() >= index_due:
+                index_due = None
+                last_index_build = time.time()
+                index_snapshot()
         
-        time.sleep(1)
+        except Exception as e:
+            print(f"Cache update error: {str(e)}")
+            # Don't spin if a rescan keeps failing
+            stop_event.wait(1)
 
 def start_background_threads():
     global observer, cache_thread
@@ -161,10 +618,11 @@ def start_background_threads():
     cache_thread.start()
 
 def stop_background_threads():
-    global observer, cache_thread
+    global observer, cache_thread, zip_cache
     
     # Signal threads to stop
     stop_event.set()
+    changes_ready.set()
     
     # Stop the observer
     if observer:
@@ -175,846 +633,317 @@ def stop_background_threads():
     if cache_thread:
         cache_thread.join(timeout=2)
     
+    with zip_cache_lock:
+        if zip_cache:
+            zip_cache.close()
+        zip_cache = False
+    
     print("Background threads stopped")
 
-@app.route('/')
-def index():
-    search_query = request.args.get('search', '').strip().lower()
-    file_type = request.args.get('type', 'all')
-    page = int(request.args.get('page', 1))
-    date_from = request.args.get('date_from', '')
-    date_to = request.args.get('date_to', '')
+def day_start(date_str, days=0):
+    """Return the local-midnight timestamp days after a YYYY-MM-DD date, or None if malformed.
+
+    Days beyond what datetime or the platform clock can convert (the day after
+    9999-12-31, or before 1970 on Windows) give -inf or inf, so the bound still holds.
+    """
+    try:
+        day = datetime.strptime(date_str, '%Y-%m-%d')
+    except ValueError:
+        return None
+    try:
+        return (day + timedelta(days=days)).timestamp()
+    except (ValueError, OverflowError, OSError):
+        return -inf if day.year < 1970 else inf
+
+def page_links(search_query, file_type, page, total_pages, date_from, date_to):
+    """Return the pagination bar as (label, href, state) tuples.
+
+    href is None for the current page and disabled entries. Query strings use the
+    same parameter order and encoding as searchUrl in static/app.js.
+    """
+    if total_pages <= 1:
+        return []
+    dates = [(key, value) for key, value in (('date_from', date_from), ('date_to', date_to)) if value]
+    def link(p, label=None):
+        query = urlencode([('search', search_query), ('type', file_type), ('page', p)] + dates)
+        return (str(label or p), f"?{query}", '')
+    def disabled(label):
+        return (label, None, 'disabled')
     
-    # Remove the initial loading page since we're doing background updates
-    if not file_cache:
-        return render_template_string('''
-            <!DOCTYPE html>
-            <html>
-            <head><title>Loading...</title></head>
-            <body>
-                <div style="text-align: center; padding: 2rem;">
-                    <h2>Building initial file index...</h2>
-                    <p>This may take a minute for large collections</p>
-                </div>
-                <script>
-                    // Check every 5 seconds if we have data
-                    function checkData() {
-                        fetch('/has_data').then(response => response.json())
-                            .then(data => {
-                                if (data.has_data) {
-                                    location.reload();
-                                } else {
-                                    setTimeout(checkData, 5000);
-                                }
-                            });
-                    }
-                    setTimeout(checkData, 5000);
-                </script>
-            </body>
-            </html>
-        ''')
+    links = [link(1, 'First'), link(page - 1, 'Previous')] if page > 1 else [disabled('First'), disabled('Previous')]
+    # Always show first page
+    if page > 3:
+        links.append(link(1))
+        if page > 4:
+            links.append(disabled('...'))
+    # Show pages around current page
+    for p in range(max(1, page - 2), min(page + 3, total_pages + 1)):
+        links.append((str(p), None, 'active') if p == page else link(p))
+    # Always show last page
+    if page < total_pages - 2:
+        if page < total_pages - 3:
+            links.append(disabled('...'))
+        links.append(link(total_pages))
+    links += [link(page + 1, 'Next'), link(total_pages, 'Last')] if page < total_pages else [disabled('Next'), disabled('Last')]
+    return links
+
+def search_params(args):
+    """Parse the search request args; malformed values fall back to their defaults.
+
+    Kept apart from search_files so the page can finish it before it starts streaming.
+    """
+    file_type = args.get('type', 'all')
+    if file_type not in SUPPORTED_EXTENSIONS:
+        file_type = 'all'
+    try:
+        page = int(args.get('page', 1))
+    except ValueError:
+        page = 1
+    date_from = args.get('date_from', '')
+    date_to = args.get('date_to', '')
+    # Bounds as local-midnight timestamps, parsed once per request; the end is exclusive
+    lo = day_start(date_from) if date_from else -inf
+    hi = day_start(date_to, 1) if date_to else inf
+    # A malformed date is ignored rather than failing the request
+    if lo is None:
+        lo, date_from = -inf, ''
+    if hi is None:
+        hi, date_to = inf, ''
+    return {
+        'search_query': args.get('search', '').strip().lower(),
+        'file_type': file_type,
+        'page': page,
+        'date_from': date_from,
+        'date_to': date_to,
+        'lo': lo,
+        'hi': hi,
+    }
+
+def search_files(params):
+    """Filter and paginate the cache for parameters from search_params."""
+    search_query, file_type, page = params['search_query'], params['file_type'], params['page']
+    date_from, date_to, lo, hi = params['date_from'], params['date_to'], params['lo'], params['hi']
     
-    filtered_files = []
+    search_terms = search_query.split()
+    matches_search = build_matcher(search_terms) if search_terms else None
+    # Take the current snapshot under the lock and filter it without holding the lock.
+    # A published list and its columns are never changed (the trigram index is only
+    # attached), so the updater can swap in a new snapshot meanwhile without waiting.
     with cache_lock:
-        for file in file_cache:
-            if file_type != 'all' and file['type'] != file_type:
-                continue
-                
-            # Date range filtering
-            if date_from or date_to:
-                file_date = datetime.fromtimestamp(file['modified']).date()
-                if date_from:
-                    from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
-                    if file_date < from_date:
-                        continue
-                if date_to:
-                    to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
-                    if file_date > to_date:
-                        continue
-                
-            if search_query:
-                search_terms = search_query.split()
-                match = any(
-                    term in file['name'].lower() or 
-                    term in file['folder'].lower()
-                    for term in search_terms
-                )
-                if not match:
-                    continue
-                    
-            filtered_files.append(file)
+        generation, files, columns = cache_generation, file_cache, file_columns
+        # Same text /updates sends, so the page can tell which version it is showing
+        version = str(last_cache_update)
     
-    total_files = len(filtered_files)
+    base_key = (generation, file_type, date_from, date_to)
+    result_key = base_key + (' '.join(search_terms),)
+    matched_ids = lookup_results(result_key)
+    
+    if matched_ids is None:
+        candidate_ids = find_prefix_results(base_key, search_terms) if search_terms else None
+        if candidate_ids is None:
+            # Cheapest checks first (date id range, then type), substring last.
+            # The prefix results already have type and date applied.
+            dated = bool(date_from or date_to)
+            if dated:
+                # The cache is newest first, so the date range is one contiguous id range
+                mtimes = columns['mtimes']
+                start = bisect_right(mtimes, -hi, key=operator.neg)
+                end = bisect_right(mtimes, -lo, key=operator.neg)
+            
+            candidate_ids = trigram_candidates(columns, search_terms) if search_terms else None
+            if dated and start >= end:
+                candidate_ids = array('i')
+            elif candidate_ids is not None:
+                # Few index candidates: one pass, id bounds before the dict lookup
+                if dated or file_type != 'all':
+                    candidate_ids = [
+                        i for i in candidate_ids
+                        if (not dated or start <= i < end)
+                        and (file_type == 'all' or files[i]['type'] == file_type)
+                    ]
+            else:
+                # Both sources are already sorted newest first, so nothing is copied here
+                if file_type == 'all':
+                    candidate_ids = range(start, end) if dated else range(len(files))
+                else:
+                    candidate_ids = columns['by_type'].get(file_type, [])
+                    if dated:
+                        candidate_ids = candidate_ids[bisect_left(candidate_ids, start):bisect_left(candidate_ids, end)]
+                
+        if matches_search and isinstance(candidate_ids, range):
+            matched_ids = scan_blob(columns, search_terms, matches_search, candidate_ids.start, candidate_ids.stop)
+        elif matches_search:
+            search_texts = columns['search_texts']
+            matched_ids = array('i', compress(candidate_ids, matches_search(map(search_texts.__getitem__, candidate_ids))))
+        else:
+            # Plain browsing pages straight out of the sorted range/partition
+            matched_ids = candidate_ids
+        store_results(result_key, matched_ids)
+    
+    total_files = len(matched_ids)
     total_pages = ceil(total_files / FILES_PER_PAGE) if FILES_PER_PAGE > 0 else 1
     page = max(1, min(page, total_pages))
     start_idx = (page - 1) * FILES_PER_PAGE
     end_idx = start_idx + FILES_PER_PAGE
-    paginated_files = filtered_files[start_idx:end_idx]
+    paginated_files = [display_row(files[i]) for i in matched_ids[start_idx:end_idx]]
     showing_end = end_idx if end_idx <= total_files else total_files
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html lang="en" class="{{ 'dark' if dark_mode else '' }}">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>DPWH Sub - DEO | Records Management Unit</title>
-            <link rel="icon" href="{{ url_for('favicon_png') }}">
-            <style>
-                                  
-                body {
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 
-                    Oxygen, Ubuntu, Cantarell, 'Open Sans', 'Helvetica Neue', sans-serif;
-                }
-                                  
-                :root {
-                    --primary: #4361ee;
-                    --primary-light: #e6e9ff;
-                    --text: #2b2d42;
-                    --text-light: #8d99ae;
-                    --bg: #f8f9fa;
-                    --card-bg: #ffffff;
-                }
-                
-                .logo-container {
-                    display: flex;
-                    align-items: center;
-                    gap: 1rem;
-                }
-                
-                .logo {
-                    width: 40px;
-                    height: 40px;
-                    background-color: var(--primary);
-                    border-radius: 50%;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    color: white;
-                    font-size: 1.5rem;
-                    font-weight: bold;
-                }
-                
-                .header-text {
-                    display: flex;
-                    flex-direction: column;
-                }
-                
-                .dark {
-                    --primary: #7c9eff;
-                    --primary-light: #2d3748;
-                    --text: #f7fafc;
-                    --text-light: #a0aec0;
-                    --bg: #1a202c;
-                    --card-bg: #2d3748;
-                }
-                
-                * {
-                    box-sizing: border-box;
-                    margin: 0;
-                    padding: 0;
-                }
-                
-                body {
-                    font-family: 'Inter', sans-serif;
-                    background-color: var(--bg);
-                    color: var(--text);
-                    line-height: 1.6;
-                    padding: 2rem 1rem;
-                    transition: background-color 0.3s, color 0.3s;
-                }
-                
-                .container {
-                    max-width: 1200px;
-                    margin: 0 auto;
-                }
-                
-                header {
-                    margin-bottom: 2rem;
-                }
-                
-                h1 {
-                    font-size: 2rem;
-                    font-weight: 600;
-                    margin-bottom: 0.5rem;
-                    color: var(--primary);
-                }
-                
-                .subtitle {
-                    color: var(--text-light);
-                    margin-bottom: 1.5rem;
-                }
-                
-                .search-container {
-                    background: var(--card-bg);
-                    border-radius: 8px;
-                    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                    padding: 1.5rem;
-                    margin-bottom: 2rem;
-                    transition: all 0.3s;
-                }
-                
-                .search-box {
-                    display: flex;
-                    gap: 0.5rem;
-                    margin-bottom: 1rem;
-                }
-                
-                .search-box button {
-                    padding: 0 1rem;
-                }
-                
-                .date-range-box {
-                    display: flex;
-                    gap: 0.5rem;
-                    margin-bottom: 1rem;
-                    align-items: center;
-                }
-                
-                .date-range-box input[type="date"] {
-                    background: var(--card-bg);
-                    color: var(--text);
-                    border: 1px solid #ddd;
-                    font-family: 'Inter', sans-serif;
-                    padding: 0.5rem;
-                    border-radius: 6px;
-                    transition: border 0.2s;
-                }
-                
-                .date-range-box input[type="date"]:focus {
-                    outline: none;
-                    border-color: var(--primary);
-                }
-                
-                .date-reset-btn {
-                    background-color: #f8f9fa;
-                    color: #6c757d;
-                    border: 1px solid #ddd;
-                    padding: 0.5rem 1rem;
-                    border-radius: 6px;
-                    font-size: 0.9rem;
-                    cursor: pointer;
-                    transition: all 0.2s;
-                    margin-left: 0.5rem;
-                }
-                
-                .date-reset-btn:hover {
-                    background-color: #e9ecef;
-                    color: #495057;
-                }
-                
-                .dark .date-range-box input[type="date"] {
-                    background: var(--card-bg);
-                    color: var(--text);
-                }
-                
-                .dark .date-reset-btn {
-                    background-color: #2d3748;
-                    color: #a0aec0;
-                    border-color: #4a5568;
-                }
-                
-                .dark .date-reset-btn:hover {
-                    background-color: #4a5568;
-                    color: #f7fafc;
-                }
-                
-                .filter-box {
-                    display: flex;
-                    gap: 0.5rem;
-                    flex-wrap: wrap;
-                }
-                
-                .filter-btn {
-                    background-color: var(--card-bg);
-                    color: var(--text);
-                    border: 1px solid #ddd;
-                    padding: 0.5rem 1rem;
-                    border-radius: 6px;
-                    font-size: 0.9rem;
-                    cursor: pointer;
-                    transition: all 0.2s;
-                }
-                
-                .filter-btn:hover {
-                    border-color: var(--primary);
-                }
-                
-                .filter-btn.active {
-                    background-color: var(--primary);
-                    color: white;
-                    border-color: var(--primary);
-                }
-                
-                input[type="text"] {
-                    flex: 1;
-                    padding: 0.75rem 1rem;
-                    border: 1px solid #ddd;
-                    border-radius: 6px;
-                    font-size: 1rem;
-                    transition: border 0.2s;
-                    background: var(--card-bg);
-                    color: var(--text);
-                }
-                
-                input[type="text"]:focus {
-                    outline: none;
-                    border-color: var(--primary);
-                }
-                
-                button {
-                    background-color: var(--primary);
-                    color: white;
-                    border: none;
-                    padding: 0 1.5rem;
-                    border-radius: 6px;
-                    font-weight: 500;
-                    cursor: pointer;
-                    transition: background 0.2s;
-                }
-                
-                button:hover {
-                    background-color: #3a56d4;
-                }
-                
-                .results-count {
-                    color: var(--text-light);
-                    font-size: 0.9rem;
-                    margin-top: 1rem;
-                }
-                
-                .file-list {
-                    display: grid;
-                    grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-                    gap: 1rem;
-                    margin-bottom: 2rem;
-                    transition: opacity 0.3s ease;
-                }
-                
-                .file-card {
-                    background: var(--card-bg);
-                    border-radius: 8px;
-                    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                    padding: 1.5rem;
-                    transition: transform 0.2s, box-shadow 0.2s;
-                }
-                
-                .file-card:hover {
-                    transform: translateY(-2px);
-                    box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-                }
-                
-                .file-name {
-                    font-weight: 600;
-                    margin-bottom: 0.5rem;
-                    color: var(--primary);
-                    text-decoration: none;
-                    display: block;
-                }
-                
-                .file-icon {
-                    font-size: 1.2rem;
-                    margin-right: 0.5rem;
-                }
-                
-                .file-meta {
-                    font-size: 0.85rem;
-                    color: var(--text-light);
-                }
-                
-                .file-meta div {
-                    margin-bottom: 0.25rem;
-                }
-                
-                .file-type {
-                    display: inline-block;
-                    padding: 0.2rem 0.5rem;
-                    background-color: var(--primary-light);
-                    color: var(--primary);
-                    border-radius: 4px;
-                    font-size: 0.75rem;
-                    margin-right: 0.5rem;
-                }
-                
-                .folder {
-                    display: flex;
-                    align-items: center;
-                    gap: 0.25rem;
-                    margin-top: 0.5rem;
-                    padding-top: 0.5rem;
-                    border-top: 1px solid #eee;
-                }
-                
-                .no-results {
-                    text-align: center;
-                    padding: 2rem;
-                    color: var(--text-light);
-                    grid-column: 1 / -1;
-                }
-                
-                .pagination {
-                    display: flex;
-                    justify-content: center;
-                    gap: 0.5rem;
-                    margin-top: 2rem;
-                }
-                
-                .page-link {
-                    padding: 0.5rem 1rem;
-                    border: 1px solid #ddd;
-                    border-radius: 4px;
-                    text-decoration: none;
-                    color: var(--text);
-                    transition: all 0.2s;
-                }
-                
-                .page-link:hover {
-                    background-color: var(--primary-light);
-                    border-color: var(--primary);
-                }
-                
-                .page-link.active {
-                    background-color: var(--primary);
-                    color: white;
-                    border-color: var(--primary);
-                }
-                
-                .page-link.disabled {
-                    opacity: 0.5;
-                    pointer-events: none;
-                }
-                
-                .zip-contents {
-                    font-size: 0.8rem;
-                    color: var(--text-light);
-                    margin-top: 0.5rem;
-                }
-                
-                .dark-mode-toggle {
-                    background: var(--primary-light);
-                    border: 1px solid var(--primary);
-                    padding: 0.4rem 1rem;
-                    border-radius: 20px;
-                    cursor: pointer;
-                    font-size: 0.9rem;
-                    transition: all 0.3s ease;
-                    display: flex;
-                    align-items: center;
-                    gap: 0.5rem;
-                    color: var(--primary);
-                    font-weight: 500;
-                }
-                
-                .dark-mode-toggle:hover {
-                    background: var(--primary);
-                    color: white;
-                    transform: scale(1.05);
-                    box-shadow: 0 2px 8px rgba(67, 97, 238, 0.3);
-                }
-                
-                .dark .dark-mode-toggle {
-                    background: rgba(124, 158, 255, 0.1);
-                    border-color: var(--primary);
-                    color: var(--primary);
-                }
-                
-                .dark .dark-mode-toggle:hover {
-                    background: var(--primary);
-                    color: white;
-                    box-shadow: 0 2px 12px rgba(124, 158, 255, 0.4);
-                }
-                                  
-                .pagination {
-                    display: flex;
-                    justify-content: center;
-                    gap: 0.25rem;
-                    margin-top: 2rem;
-                    flex-wrap: wrap;
-                }
-
-                .page-link {
-                    padding: 0.5rem 0.75rem;
-                    min-width: 2.5rem;
-                    text-align: center;
-                    border: 1px solid #ddd;
-                    border-radius: 4px;
-                    text-decoration: none;
-                    color: var(--text);
-                    transition: all 0.2s;
-                }
-
-                .page-link:hover {
-                    background-color: var(--primary-light);
-                    border-color: var(--primary);
-                }
-
-                .page-link.active {
-                    background-color: var(--primary);
-                    color: white;
-                    border-color: var(--primary);
-                }
-
-                .page-link.disabled {
-                    opacity: 0.5;
-                    pointer-events: none;
-                    background-color: var(--card-bg);
-                }
-
-                .loading-indicator {
-                    position: fixed;
-                    bottom: 20px;
-                    right: 20px;
-                    background: var(--primary);
-                    color: white;
-                    padding: 8px 16px;
-                    border-radius: 20px;
-                    z-index: 1000;
-                    box-shadow: 0 2px 10px rgba(0,0,0,0.2);
-                    transition: all 0.3s ease;
-                }
-
-                @media (max-width: 768px) {
-                    .pagination {
-                        gap: 0.1rem;
-                    }
-                    .page-link {
-                        padding: 0.3rem 0.5rem;
-                        min-width: 2rem;
-                    }
-                }
-                
-                @media (max-width: 768px) {
-                    .file-list {
-                        grid-template-columns: 1fr;
-                    }
-                    
-                    .pagination {
-                        flex-wrap: wrap;
-                    }
-                    
-                    .filter-box {
-                        justify-content: center;
-                    }
-                    
-                    .date-range-box {
-                        flex-direction: column;
-                        align-items: flex-start;
-                    }
-                    
-                    .search-box {
-                        flex-direction: column;
-                    }
-                    
-                    .search-box button {
-                        width: 100%;
-                        margin-top: 0.5rem;
-                    }
-                }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <header>
-                    <div style="display: flex; justify-content: space-between; align-items: center;">
-                        <div class="logo-container">
-                            <div class="header-text">
-                                <h1>DPWH Sub - DEO | Records Management Unit</h1>
-                                <p class="subtitle">Search files by name, folder, date, or type</p>
-                            </div>
-                        </div>
-            <button onclick="toggleDarkMode()" class="dark-mode-toggle">
-    {{ '☀️ Light Mode' if dark_mode else '🌙 Dark Mode' }}
-</button>
-                    </div>
-                </header>
-                
-                <div class="search-container">
-                    <div class="search-box">
-                        <input type="text" id="search-input" placeholder="Automatically search files, date, or folders..." 
-                               value="{{ search_query }}" autofocus>
-                                   <button id="search-button">Search</button>
-                    </div>
-                    <div class="date-range-box">
-                        <input type="date" id="date-from" name="date_from" value="{{ date_from }}"
-                               placeholder="From date">
-                        <span>to</span>
-                        <input type="date" id="date-to" name="date_to" value="{{ date_to }}"
-                               placeholder="To date">
-                    <button onclick="resetDates()" class="date-reset-btn" type="button">
-                        Reset
-                    </button>
-                    </div>
- <div class="filter-box">
-    <a href="javascript:void(0)" onclick="setFileType('all')" 
-       class="filter-btn {% if file_type == 'all' %}active{% endif %}">All Files</a>
-    {% for ext, label in SUPPORTED_EXTENSIONS.items() %}
-        <a href="javascript:void(0)" onclick="setFileType('{{ ext }}')" 
-           class="filter-btn {% if file_type == ext %}active{% endif %}">
-            {{ label }}
-        </a>
-    {% endfor %}
-</div>
-                    <div class="results-count">
-                        Found {{ total_files }} file{% if total_files != 1 %}s{% endif %}
-                        {% if file_type != 'all' %} ({{ SUPPORTED_EXTENSIONS.get(file_type, '') }}){% endif %}
-                        {% if search_query %} matching "{{ search_query }}"{% endif %}
-                        {% if date_from or date_to %} modified between {{ date_from }} and {{ date_to }}{% endif %}
-                        (Showing {{ start_idx + 1 }}-{{ showing_end }})
-                    </div>
-                </div>
-                
-                <div class="file-list" id="file-list-container">
-                    {% if not paginated_files %}
-                        <div class="no-results">
-                            <p>No files found{% if search_query %} matching "{{ search_query }}"{% endif %}</p>
-                            {% if date_from or date_to %}
-                                <p>modified between {{ date_from }} and {{ date_to }}</p>
-                            {% endif %}
-                            <p>Try a different search term, file type, or date range</p>
-                        </div>
-                    {% else %}
-                        {% for file in paginated_files %}
-                            <div class="file-card" data-file-path="{{ file.path }}">
-                                <a href="/file/{{ file.path }}" class="file-name" target="_blank">
-                                    <span class="file-icon">{{ file.icon }}</span>{{ file.name }}
-                                </a>
-                                <div class="file-meta">
-                                    <div>
-                                        <span class="file-type">{{ file.type|upper }}</span>
-                                        {{ file.size }}
-                                    </div>
-                                    <div>Modified: {{ file.modified_str }}</div>
-                                    {% if file.zip_contents %}
-                                        <div class="zip-contents">
-                                            Contains: {{ file.zip_contents|join(', ') }}{% if file.zip_contents|length >= 5 %}...{% endif %}
-                                        </div>
-                                    {% endif %}
-                                    <div class="folder">
-                                        <svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">
-                                            <path d="M22 19a2 2 0 0 1-2 2H4a2 2 0 0 1-2-2V5a2 2 0 0 1 2-2h5l2 2h9a2 2 0 0 1 2 2z"></path>
-                                        </svg>
-                                        {{ file.folder }}
-                                    </div>
-                                </div>
-                            </div>
-                        {% endfor %}
-                    {% endif %}
-                </div>
-                
-                {% if total_pages > 1 %}
-                <div class="pagination">
-                    {% if page > 1 %}
-                        <a href="?search={{ search_query }}&type={{ file_type }}&page=1&date_from={{ date_from }}&date_to={{ date_to }}" class="page-link">First</a>
-                        <a href="?search={{ search_query }}&type={{ file_type }}&page={{ page - 1 }}&date_from={{ date_from }}&date_to={{ date_to }}" class="page-link">Previous</a>
-                    {% else %}
-                        <span class="page-link disabled">First</span>
-                        <span class="page-link disabled">Previous</span>
-                    {% endif %}
-
-                    {# Always show first page #}
-                    {% if page > 3 %}
-                        <a href="?search={{ search_query }}&type={{ file_type }}&page=1&date_from={{ date_from }}&date_to={{ date_to }}" class="page-link">1</a>
-                        {% if page > 4 %}
-                            <span class="page-link disabled">...</span>
-                        {% endif %}
-                    {% endif %}
-
-                    {# Show pages around current page #}
-                    {% for p in range([1, page-2]|max, [page+3, total_pages + 1]|min) %}
-                        {% if p == page %}
-                            <span class="page-link active">{{ p }}</span>
-                        {% else %}
-                            <a href="?search={{ search_query }}&type={{ file_type }}&page={{ p }}&date_from={{ date_from }}&date_to={{ date_to }}" class="page-link">{{ p }}</a>
-                        {% endif %}
-                    {% endfor %}
-
-                    {# Always show last page #}
-                    {% if page < total_pages - 2 %}
-                        {% if page < total_pages - 3 %}
-                            <span class="page-link disabled">...</span>
-                        {% endif %}
-                        <a href="?search={{ search_query }}&type={{ file_type }}&page={{ total_pages }}&date_from={{ date_from }}&date_to={{ date_to }}" class="page-link">{{ total_pages }}</a>
-                    {% endif %}
-
-                    {% if page < total_pages %}
-                        <a href="?search={{ search_query }}&type={{ file_type }}&page={{ page + 1 }}&date_from={{ date_from }}&date_to={{ date_to }}" class="page-link">Next</a>
-                        <a href="?search={{ search_query }}&type={{ file_type }}&page={{ total_pages }}&date_from={{ date_from }}&date_to={{ date_to }}" class="page-link">Last</a>
-                    {% else %}
-                        <span class="page-link disabled">Next</span>
-                        <span class="page-link disabled">Last</span>
-                    {% endif %}
-                </div>
-                {% endif %}
-            </div>
-
-          <script>
-    // Global variables
-    let performSearch; // Declare the function variable globally
-
-    // Global functions
-    function resetDates() {
-        const dateFromInput = document.getElementById('date-from');
-        const dateToInput = document.getElementById('date-to');
-        if (dateFromInput && dateToInput) {
-            dateFromInput.value = '';
-            dateToInput.value = '';
-            if (typeof performSearch === 'function') {
-                performSearch();
-            }
-        }
+    return {
+        'search_query': search_query,
+        'file_type': file_type,
+        'paginated_files': paginated_files,
+        'total_files': total_files,
+        'total_pages': total_pages,
+        'page': page,
+        'start_idx': start_idx,
+        'showing_end': showing_end,
+        'page_links': page_links(search_query, file_type, page, total_pages, date_from, date_to),
+        'date_from': date_from,
+        'date_to': date_to,
+        'version': version,
     }
 
-    function setFileType(type) {
-        const dateFromInput = document.getElementById('date-from');
-        const dateToInput = document.getElementById('date-to');
-        const searchInput = document.getElementById('search-input');
-        if (dateFromInput && dateToInput && searchInput) {
-            const dateFrom = dateFromInput.value;
-            const dateTo = dateToInput.value;
-            const searchQuery = searchInput.value;
-            
-            // Get current page from URL or default to current page
-            const urlParams = new URLSearchParams(window.location.search);
-            const currentPage = urlParams.get('page') || {{ page }};
-            
-            let url = `?search=${encodeURIComponent(searchQuery)}&type=${type}&page=${currentPage}`;
-            if (dateFrom) url += `&date_from=${dateFrom}`;
-            if (dateTo) url += `&date_to=${dateTo}`;
-            
-            window.location.href = url;
-        }
-    }
+# Loaded and compiled once, rather than looked up in Jinja's cache per request
+HEAD_TEMPLATE = app.jinja_env.get_template('head.html')
+INDEX_TEMPLATE = app.jinja_env.get_template('index.html')
+# Display row fields in the order index.html's card loop unpacks them
+PAGE_ROW_FIELDS = operator.itemgetter('path', 'icon', 'name', 'type', 'size', 'modified_str', 'zip_contents', 'folder')
 
-    function toggleDarkMode() {
-        fetch('/toggle_dark_mode').then(() => location.reload());
-    }
+def static_version():
+    """Checksum of the static files, so their URLs change whenever their content does."""
+    crc = 0
+    for name in sorted(os.listdir(app.static_folder)):
+        with open(os.path.join(app.static_folder, name), 'rb') as f:
+            crc = zlib.crc32(f.read(), crc)
+    return f"{crc:08x}"
 
-    // Wait for DOM to be fully loaded before executing JavaScript
-    document.addEventListener('DOMContentLoaded', function() {
-        // ⚡ Instant Search (Debounced Typing)
-        let searchTimer;
-        const searchInput = document.getElementById('search-input');
-        const dateFromInput = document.getElementById('date-from');
-        const dateToInput = document.getElementById('date-to');
-        const searchButton = document.getElementById('search-button');
-        const fileListContainer = document.getElementById('file-list-container');
-        let lastTypingTime = 0;
-        
-        // Only proceed if all required elements exist
-        if (searchInput && dateFromInput && dateToInput && searchButton && fileListContainer) {
-            // Define performSearch function and assign it to the global variable
-            performSearch = function() {
-                const searchQuery = searchInput.value.trim().toLowerCase();
-                const dateFrom = dateFromInput.value;
-                const dateTo = dateToInput.value;
-                const fileType = '{{ file_type }}';
-                
-                // Get current page from URL or default to current page
-                const urlParams = new URLSearchParams(window.location.search);
-                const currentPage = urlParams.get('page') || {{ page }};
-                
-                // Show subtle loading indicator
-                const loadingIndicator = document.createElement('div');
-                loadingIndicator.className = 'loading-indicator';
-                loadingIndicator.style = 'position: fixed; bottom: 20px; right: 20px; background: var(--primary); color: white; padding: 8px 16px; border-radius: 20px; z-index: 1000;';
-                loadingIndicator.textContent = 'Updating results...';
-                document.body.appendChild(loadingIndicator);
-                
-                // Build URL with current parameters including page
-                let url = `?search=${encodeURIComponent(searchQuery)}&type=${fileType}&page=${currentPage}`;
-                if (dateFrom) url += `&date_from=${dateFrom}`;
-                if (dateTo) url += `&date_to=${dateTo}`;
-                
-                // Use fetch API to get updated results without full page reload
-                fetch(url)
-                    .then(response => response.text())
-                    .then(html => {
-                        // Parse the HTML response
-                        const parser = new DOMParser();
-                        const doc = parser.parseFromString(html, 'text/html');
-                        const newContent = doc.querySelector('.file-list').innerHTML;
-                        const newPagination = doc.querySelector('.pagination')?.innerHTML || '';
-                        const newResultsCount = doc.querySelector('.results-count').innerHTML;
-                        
-                        // Update the page content smoothly
-                        fileListContainer.style.opacity = '0.8';
-                        setTimeout(() => {
-                            fileListContainer.innerHTML = newContent;
-                            fileListContainer.style.opacity = '1';
-                            if (newPagination) {
-                                const paginationDiv = document.querySelector('.pagination');
-                                if (paginationDiv) {
-                                    paginationDiv.innerHTML = newPagination;
-                                }
-                            }
-                            document.querySelector('.results-count').innerHTML = newResultsCount;
-                            loadingIndicator.textContent = 'Updated!';
-                            setTimeout(() => loadingIndicator.remove(), 1000);
-                            
-                            // Update browser history to maintain current page
-                            window.history.pushState({}, '', url);
-                        }, 200);
-                    })
-                    .catch(error => {
-                        console.error('Search error:', error);
-                        loadingIndicator.textContent = 'Update failed';
-                        setTimeout(() => loadingIndicator.remove(), 2000);
-                    });
-            };
-            
-            // Set up event listeners with optimized debouncing
-            searchInput.addEventListener('input', function() {
-                lastTypingTime = Date.now();
-                clearTimeout(searchTimer);
-                searchTimer = setTimeout(performSearch, {{ DEBOUNCE_DELAY }});
-            });
-            
-            searchButton.addEventListener('click', performSearch);
-            
-            // Add change listeners for date inputs
-            dateFromInput.addEventListener('change', performSearch);
-            dateToInput.addEventListener('change', performSearch);
-            
-            // 🔄 Real-time updates with Server-Sent Events
-            const eventSource = new EventSource('/updates');
-            eventSource.onmessage = function(e) {
-                console.log('File system update detected');
-                // Only refresh if we're not currently typing
-                if (!searchInput.value || Date.now() - lastTypingTime > 5000) {
-                    performSearch();
-                }
-            };
-                                  
-            // Add popstate event listener to handle browser back/forward navigation
-            window.addEventListener('popstate', function() {
-                performSearch();
-            });
-        }
-    });
-</script>
-        </body>
-        </html>
-    ''', 
-    search_query=search_query,
-    file_type=file_type,
-    paginated_files=paginated_files,
-    total_files=total_files,
-    total_pages=total_pages,
-    page=page,
-    start_idx=start_idx,
-    showing_end=showing_end,
-    SUPPORTED_EXTENSIONS=SUPPORTED_EXTENSIONS,
-    dark_mode=dark_mode,
-    date_from=date_from,
-    date_to=date_to,
-    DEBOUNCE_DELAY=DEBOUNCE_DELAY)
+STATIC_VERSION = static_version()
+
+@app.url_defaults
+def add_static_version(endpoint, values):
+    if endpoint == 'static':
+        values.setdefault('v', STATIC_VERSION)
+
+@app.after_request
+def cache_static(response):
+    # Versioned URLs never change content, so browsers can keep them without revalidating.
+    # Only for the file itself; an error or a missing file has to be asked for again.
+    if (response.status_code == 200 and request.endpoint == 'static'
+            and request.args.get('v') == STATIC_VERSION):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+def gzip_stream(chunks):
+    """Gzip a streamed body, flushing after each chunk so nothing waits for the end."""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.mimetype not in COMPRESS_MIMETYPES
+            or 'Content-Encoding' in response.headers or 'gzip' not in request.accept_encodings):
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.is_streamed or response.direct_passthrough:
+        # The streamed page, and static files, which the server may hand over as a
+        # file wrapper that has a length but can't be read through get_data()
+        response.response = gzip_stream(response.response)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(gzip.compress(data, COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    # Byte ranges of the file don't apply to the gzip body, and the tag must not claim
+    # the gzip body is byte-for-byte the identity one
+    response.headers.pop('Accept-Ranges', None)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def search_etag(version, *extra):
+    """ETag for a search response: the cache version it was built from plus the exact query."""
+    return '-'.join((version, f"{zlib.crc32(request.query_string):08x}") + extra)
+
+def not_modified(etag):
+    """Return a 304 response if the client already holds etag, else None."""
+    # Weak comparison, since compress_response marks the tags of gzip bodies weak
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+def revalidate(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/')
+def index():
+    # Remove the initial loading page since we're doing background updates
+    if not file_cache:
+        return render_template('loading.html')
+    
+    dark = request.cookies.get('dark') == '1'
+    # The page also embeds the static file URLs and the theme, so both are part of its tag
+    etag = search_etag(str(last_cache_update), STATIC_VERSION, 'dark' if dark else 'light')
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+    
+    # Parsed before anything is sent, since errors can't change the status once it streams
+    params = search_params(request.args)
+    def generate():
+        # <head> goes out before the search runs, so the browser fetches the CSS meanwhile;
+        # the body then streams in chunks while the file cards render
+        yield HEAD_TEMPLATE.render(dark=dark)
+        results = search_files(params)
+        # Tuples unpacked by the card loop, instead of a failed getattr then a key lookup per field
+        results['paginated_files'] = list(map(PAGE_ROW_FIELDS, results['paginated_files']))
+        html = INDEX_TEMPLATE.stream(
+            **results,
+            dark=dark,
+            SUPPORTED_EXTENSIONS=SUPPORTED_EXTENSIONS,
+            DEBOUNCE_DELAY=DEBOUNCE_DELAY)
+        html.enable_buffering(40)
+        yield from html
+    
+    response = Response(stream_with_context(generate()), mimetype='text/html')
+    # The theme comes from a cookie, so a cached copy is only good for the same cookie
+    response.vary.add('Cookie')
+    return revalidate(response, etag)
 
 # API Endpoints
-@app.route('/toggle_dark_mode')
-def toggle_dark_mode():
-    global dark_mode
-    dark_mode = not dark_mode
-    return jsonify({"dark_mode": dark_mode})
+@app.route('/api/search')
+def api_search():
+    # Unchanged cache and query: skip the search and the body entirely
+    unchanged = not_modified(search_etag(str(last_cache_update)))
+    if unchanged:
+        return unchanged
+    
+    # Same cache and query as a recent request: reuse its body rather than
+    # re-running the page's display rows and JSON encoding
+    key = (str(last_cache_update), request.query_string)
+    entry = lookup_response(key)
+    if entry is None:
+        results = search_files(search_params(request.args))
+        results['files'] = results.pop('paginated_files')
+        entry = (search_etag(results['version']), app.json.dumps(results).encode())
+        if results['version'] == key[0]:
+            store_response(key, entry)
+    etag, body = entry
+    return revalidate(Response(body, mimetype='application/json'), etag)
 
 @app.route('/has_data')
 def has_data():
@@ -1023,18 +952,32 @@ def has_data():
 @app.route('/updates')
 def updates():
     def event_stream():
-        last_version = app.last_cache_update
-        last_file_count = len(file_cache)
-        while True:
-            # Check if cache was updated or file count changed significantly
-            current_file_count = len(file_cache)
-            if app.last_cache_update > last_version or abs(current_file_count - last_file_count) > 5:
-                last_version = app.last_cache_update
-                last_file_count = current_file_count
-                yield f"data: {last_version}\n\n"
-            time.sleep(1)  # Check more frequently but only send updates when needed
+        subscriber = queue.Queue()
+        with subscribers_lock:
+            update_subscribers.add(subscriber)
+        try:
+            # Start with the current version, so a reconnecting tab can tell if it missed one
+            yield f"data: {last_cache_update}\n\n"
+            while True:
+                # Sleep until the cache is republished; send only the newest of a burst
+                try:
+                    version = subscriber.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    # A comment line: ignored by EventSource, but writing it is what
+                    # notices a closed tab and frees its server thread
+                    yield ": keepalive\n\n"
+                    continue
+                while not subscriber.empty():
+                    version = subscriber.get_nowait()
+                yield f"data: {version}\n\n"
+        finally:
+            with subscribers_lock:
+                update_subscribers.discard(subscriber)
     
-    return Response(event_stream(), mimetype="text/event-stream")
+    response = Response(event_stream(), mimetype="text/event-stream")
+    # Proxies must not buffer or compress the stream; each message has to arrive as sent
+    response.headers['Cache-Control'] = 'no-cache, no-transform'
+    return response
 
 @app.route('/file/<path:filename>')
 def serve_file(filename):
@@ -1054,7 +997,7 @@ if __name__ == '__main__':
         print("Building initial file cache...")
         webbrowser.open(url)
         
-        app.run(port=PORT, threaded=True)
+        serve(app, host='127.0.0.1', port=PORT, threads=SERVER_THREADS)
         
     except KeyboardInterrupt:
         print("\nShutting down gracefully...")
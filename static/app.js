@@ -0,0 +1,349 @@
+// Global variables
+let performSearch; // Declare the function variable globally
+let currentFileType = window.__CFG.fileType;
+const FILE_TYPE_LABELS = window.__CFG.fileTypeLabels;
+const UPDATE_REFRESH_INTERVAL = 1500; // ms between refreshes triggered by file changes
+const RESPONSE_CACHE_SIZE = 50; // recent /api/search responses kept for instant re-display
+const RESPONSE_STORAGE_PREFIX = 'search:';
+
+// Global functions
+function escapeHtml(value) {
+    return String(value).replace(/[&<>"']/g, ch => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
+}
+
+// One canonical form for every search URL, so equal searches share cache entries.
+// Matches page_links in App.py.
+function searchUrl(search, type, page, dateFrom, dateTo) {
+    const params = new URLSearchParams({search: search, type: type, page: page});
+    if (dateFrom) params.set('date_from', dateFrom);
+    if (dateTo) params.set('date_to', dateTo);
+    return '?' + params.toString();
+}
+
+// Client-side counterparts of the file card, results count and pagination markup.
+// Cards are cloned from <template id="row-tpl"> and filled in through textContent,
+// so no card markup is parsed per row and nothing in them needs escaping.
+function renderFiles(data) {
+    const fragment = document.createDocumentFragment();
+    if (!data.files.length) {
+        const empty = document.createElement('div');
+        empty.className = 'no-results';
+        empty.innerHTML = `
+            <p>No files found${data.search_query ? ` matching "${escapeHtml(data.search_query)}"` : ''}</p>
+            ${data.date_from || data.date_to ? `<p>modified between ${escapeHtml(data.date_from)} and ${escapeHtml(data.date_to)}</p>` : ''}
+            <p>Try a different search term, file type, or date range</p>`;
+        fragment.appendChild(empty);
+        return fragment;
+    }
+    const rowTemplate = document.getElementById('row-tpl').content.firstElementChild;
+    for (const file of data.files) {
+        const card = rowTemplate.cloneNode(true);
+        card.dataset.filePath = file.path;
+        const link = card.querySelector('.file-name');
+        link.setAttribute('href', '/file/' + file.path);
+        link.querySelector('.file-icon').textContent = file.icon;
+        link.append(file.name);
+        card.querySelector('.file-type').textContent = file.type.toUpperCase();
+        card.querySelector('.file-size').textContent = file.size;
+        card.querySelector('.file-modified').textContent = 'Modified: ' + file.modified_str;
+        const zipContents = card.querySelector('.zip-contents');
+        if (file.zip_contents && file.zip_contents.length) {
+            zipContents.textContent = 'Contains: ' + file.zip_contents.join(', ') + (file.zip_contents.length >= 5 ? '...' : '');
+        } else {
+            zipContents.remove();
+        }
+        card.querySelector('.folder-name').textContent = file.folder;
+        fragment.appendChild(card);
+    }
+    return fragment;
+}
+
+function renderResultsCount(data) {
+    let text = `Found ${data.total_files} file${data.total_files !== 1 ? 's' : ''}`;
+    if (data.file_type !== 'all') text += ` (${FILE_TYPE_LABELS[data.file_type] || ''})`;
+    if (data.search_query) text += ` matching "${data.search_query}"`;
+    if (data.date_from || data.date_to) text += ` modified between ${data.date_from} and ${data.date_to}`;
+    text += ` (Showing ${data.start_idx + 1}-${data.showing_end})`;
+    return escapeHtml(text);
+}
+
+// The server works out which page links to show; this only draws them
+function renderPagination(data) {
+    const paginationDiv = document.querySelector('.pagination');
+    if (!paginationDiv) return;
+    paginationDiv.hidden = !data.page_links.length;
+    paginationDiv.innerHTML = data.page_links.map(([label, href, state]) => href
+        ? `<a href="${escapeHtml(href)}" class="page-link">${escapeHtml(label)}</a>`
+        : `<span class="page-link ${state}">${escapeHtml(label)}</span>`
+    ).join('');
+}
+
+function resetDates() {
+    const dateFromInput = document.getElementById('date-from');
+    const dateToInput = document.getElementById('date-to');
+    if (dateFromInput && dateToInput) {
+        dateFromInput.value = '';
+        dateToInput.value = '';
+        if (typeof performSearch === 'function') {
+            performSearch();
+        }
+    }
+}
+
+function markActiveFileType() {
+    document.querySelectorAll('.filter-btn').forEach(btn => {
+        btn.classList.toggle('active', btn.dataset.type === currentFileType);
+    });
+}
+
+// Switching type goes through the JSON API; the page itself stays loaded
+function setFileType(type) {
+    currentFileType = type;
+    markActiveFileType();
+    if (typeof performSearch === 'function') {
+        performSearch();
+    }
+}
+
+// Theme preference lives in a cookie the server reads when rendering; toggling needs no reload
+function updateDarkModeLabel() {
+    const toggle = document.getElementById('dark-mode-toggle');
+    if (toggle) {
+        toggle.textContent = document.documentElement.classList.contains('dark') ? '☀️ Light Mode' : '🌙 Dark Mode';
+    }
+}
+
+function toggleDarkMode() {
+    const dark = document.documentElement.classList.toggle('dark');
+    document.cookie = `dark=${dark ? '1' : '0'}; path=/; max-age=31536000; SameSite=Lax`;
+    updateDarkModeLabel();
+}
+
+// Wait for DOM to be fully loaded before executing JavaScript
+document.addEventListener('DOMContentLoaded', function() {
+    updateDarkModeLabel();
+
+    // ⚡ Instant Search (Debounced Typing)
+    let searchTimer;
+    const searchInput = document.getElementById('search-input');
+    const dateFromInput = document.getElementById('date-from');
+    const dateToInput = document.getElementById('date-to');
+    const searchButton = document.getElementById('search-button');
+    const fileListContainer = document.getElementById('file-list-container');
+    let lastTypingTime = 0;
+
+    // Only proceed if all required elements exist
+    if (searchInput && dateFromInput && dateToInput && searchButton && fileListContainer) {
+        let searchController = null;
+        // Cache version the page is showing; /updates messages move it forward
+        let seenVersion = window.__CFG.version;
+
+        // Recent responses by URL, mirrored to sessionStorage so reloads and back/forward
+        // can reuse them. An entry is only used while its cache version is still current.
+        const responseCache = new Map();
+        const staleKeys = [];
+        for (let i = 0; i < sessionStorage.length; i++) {
+            const key = sessionStorage.key(i);
+            if (!key.startsWith(RESPONSE_STORAGE_PREFIX)) continue;
+            const data = JSON.parse(sessionStorage.getItem(key));
+            if (data.version === seenVersion) {
+                responseCache.set(key.slice(RESPONSE_STORAGE_PREFIX.length), data);
+            } else {
+                staleKeys.push(key);
+            }
+        }
+        staleKeys.forEach(key => sessionStorage.removeItem(key));
+
+        function rememberResponse(url, data) {
+            responseCache.delete(url);
+            responseCache.set(url, data);
+            try {
+                sessionStorage.setItem(RESPONSE_STORAGE_PREFIX + url, JSON.stringify(data));
+            } catch (e) {
+                // Storage full or disabled; the in-memory copy still works
+            }
+            if (responseCache.size > RESPONSE_CACHE_SIZE) {
+                const oldest = responseCache.keys().next().value;
+                responseCache.delete(oldest);
+                sessionStorage.removeItem(RESPONSE_STORAGE_PREFIX + oldest);
+            }
+        }
+
+        function cachedResponse(url) {
+            const data = responseCache.get(url);
+            if (!data || data.version !== seenVersion) return null;
+            // Move it to the newest end of the LRU order
+            responseCache.delete(url);
+            responseCache.set(url, data);
+            return data;
+        }
+
+        // Build the new cards off-DOM, then swap everything in one frame
+        function showResults(data, url, controller, done) {
+            const cards = renderFiles(data);
+            requestAnimationFrame(() => {
+                // A newer search started after this response arrived
+                if (controller.signal.aborted) {
+                    done(false);
+                    return;
+                }
+                fileListContainer.replaceChildren(cards);
+                fileListContainer.style.opacity = '1';
+                renderPagination(data);
+                document.querySelector('.results-count').innerHTML = renderResultsCount(data);
+                done(true);
+
+                // Update browser history to maintain current page
+                if (url !== window.location.search) {
+                    window.history.pushState({}, '', url);
+                }
+            });
+        }
+
+        // Define performSearch function and assign it to the global variable
+        performSearch = function() {
+            // Only the newest search matters; a late older response must not overwrite it
+            if (searchController) searchController.abort();
+            const controller = searchController = new AbortController();
+
+            const searchQuery = searchInput.value.trim().toLowerCase();
+            const dateFrom = dateFromInput.value;
+            const dateTo = dateToInput.value;
+            const fileType = currentFileType;
+
+            // Get current page from URL or default to current page
+            const urlParams = new URLSearchParams(window.location.search);
+            const currentPage = urlParams.get('page') || window.__CFG.page;
+
+            // Build URL with current parameters including page
+            const url = searchUrl(searchQuery, fileType, currentPage, dateFrom, dateTo);
+
+            const cached = cachedResponse(url);
+            if (cached) {
+                showResults(cached, url, controller, () => {});
+                return;
+            }
+
+            // Show subtle loading indicator
+            const loadingIndicator = document.createElement('div');
+            loadingIndicator.className = 'loading-indicator';
+            loadingIndicator.style = 'position: fixed; bottom: 20px; right: 20px; background: var(--primary); color: white; padding: 8px 16px; border-radius: 20px; z-index: 1000;';
+            loadingIndicator.textContent = 'Updating results...';
+            document.body.appendChild(loadingIndicator);
+
+            // Use fetch API to get updated results without full page reload.
+            // The list is dimmed only while the request is in flight.
+            fileListContainer.style.opacity = '0.8';
+            fetch('/api/search' + url, {signal: controller.signal})
+                .then(response => response.json())
+                .then(data => {
+                    rememberResponse(url, data);
+                    showResults(data, url, controller, shown => {
+                        if (!shown) {
+                            loadingIndicator.remove();
+                            return;
+                        }
+                        loadingIndicator.textContent = 'Updated!';
+                        setTimeout(() => loadingIndicator.remove(), 1000);
+                    });
+                })
+                .catch(error => {
+                    if (error.name === 'AbortError') {
+                        loadingIndicator.remove();
+                        return;
+                    }
+                    console.error('Search error:', error);
+                    fileListContainer.style.opacity = '1';
+                    loadingIndicator.textContent = 'Update failed';
+                    setTimeout(() => loadingIndicator.remove(), 2000);
+                });
+        };
+
+        // Set up event listeners with optimized debouncing
+        searchInput.addEventListener('input', function() {
+            lastTypingTime = Date.now();
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(performSearch, window.__CFG.debounce);
+        });
+
+        searchButton.addEventListener('click', performSearch);
+
+        // Add change listeners for date inputs
+        dateFromInput.addEventListener('change', performSearch);
+        dateToInput.addEventListener('change', performSearch);
+
+        // 🔄 Real-time updates with Server-Sent Events
+        // The stream opens with the current cache version, then sends each new one
+        let eventSource = null;
+        let refreshTimer = null;
+        let lastRefresh = 0;
+
+        function refreshFromUpdate() {
+            refreshTimer = null;
+            // Only refresh if we're not currently typing
+            if (!searchInput.value || Date.now() - lastTypingTime > 5000) {
+                lastRefresh = Date.now();
+                performSearch();
+            }
+        }
+
+        function openUpdates() {
+            eventSource = new EventSource('/updates');
+            eventSource.onmessage = function(e) {
+                if (e.data === seenVersion) return;
+                seenVersion = e.data;
+                console.log('File system update detected');
+                // Trailing-edge throttle: a burst of updates ends in one refresh of the latest state
+                if (!refreshTimer) {
+                    refreshTimer = setTimeout(refreshFromUpdate, Math.max(0, UPDATE_REFRESH_INTERVAL - (Date.now() - lastRefresh)));
+                }
+            };
+        }
+        openUpdates();
+
+        // Hidden tabs don't listen; closing the stream also frees its server thread.
+        // On return the stream's first message tells whether anything changed meanwhile.
+        function closeUpdates() {
+            if (eventSource) {
+                eventSource.close();
+                eventSource = null;
+            }
+        }
+
+        document.addEventListener('visibilitychange', function() {
+            if (document.hidden) {
+                closeUpdates();
+            } else if (!eventSource) {
+                openUpdates();
+            }
+        });
+
+        // Leaving the page (or parking it in the back/forward cache) closes the stream
+        // right away; a page restored from that cache reconnects
+        window.addEventListener('pagehide', closeUpdates);
+        window.addEventListener('pageshow', function() {
+            if (!eventSource && !document.hidden) {
+                openUpdates();
+            }
+        });
+
+        // Add popstate event listener to handle browser back/forward navigation
+        window.addEventListener('popstate', function() {
+            const params = new URLSearchParams(window.location.search);
+            currentFileType = params.get('type') || 'all';
+            markActiveFileType();
+            performSearch();
+        });
+
+        // Page links fetch the next slice instead of reloading the page
+        document.querySelector('.pagination').addEventListener('click', function(e) {
+            const link = e.target.closest('a.page-link');
+            if (!link) return;
+            e.preventDefault();
+            window.history.pushState({}, '', link.getAttribute('href'));
+            performSearch();
+        });
+    }
+});